@@ -0,0 +1,92 @@
+"""Benchmark the bulk repository write path against row-by-row inserts.
+
+Usage:
+    uv run benchmarks/bulk_insert.py --sources 200 --quotations 50
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add the src directory to the Python path so we can import argumem
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from argumem.db import init_db, get_db, transaction
+from argumem.repositories.database import SourceRepository, QuotationRepository
+
+
+def make_corpus(n_sources: int, n_quotations: int):
+    """Build synthetic sources, each with its quotations."""
+    return [
+        (
+            {"content": f"Source text {i} " * 50, "context": "benchmark", "title": f"Source {i}"},
+            [{"text": f"Quotation {j} of source {i}", "locator": "middle"} for j in range(n_quotations)],
+        )
+        for i in range(n_sources)
+    ]
+
+
+def insert_row_by_row(db_path: str, corpus) -> None:
+    """The previous write path: one commit per source, one execute per quotation."""
+    for source, quotations in corpus:
+        conn = get_db(db_path)
+        try:
+            cursor = conn.execute(
+                "INSERT INTO sources (raw_text, context, title) VALUES (?, ?, ?)",
+                (source["content"], source["context"], source["title"])
+            )
+            conn.commit()
+            source_id = cursor.lastrowid
+        finally:
+            conn.close()
+
+        conn = get_db(db_path)
+        try:
+            for quotation in quotations:
+                conn.execute(
+                    "INSERT INTO quotations (source_id, quotation_text, locator) VALUES (?, ?, ?)",
+                    (source_id, quotation["text"], quotation["locator"])
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def insert_bulk(db_path: str, corpus, batch_size: int) -> None:
+    """The bulk write path: multi-row inserts inside a single transaction."""
+    source_repo = SourceRepository(db_path)
+    quotation_repo = QuotationRepository(db_path)
+    with transaction(db_path) as conn:
+        source_ids = source_repo.create_many([source for source, _ in corpus], batch_size, conn=conn)
+        for source_id, (_, quotations) in zip(source_ids, corpus):
+            quotation_repo.create_many(quotations, source_id, batch_size, conn=conn)
+
+
+def run(name: str, insert, corpus) -> None:
+    rows = sum(1 + len(quotations) for _, quotations in corpus)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        init_db(db_path).close()
+        start = time.perf_counter()
+        insert(db_path, corpus)
+        elapsed = time.perf_counter() - start
+    print(f"{name:<24} {rows:>8} rows  {elapsed:8.3f} s  {rows / elapsed:>10.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sources", type=int, default=200)
+    parser.add_argument("--quotations", type=int, default=50, help="Quotations per source")
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[50, 500])
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.sources, args.quotations)
+    run("row-by-row", insert_row_by_row, corpus)
+    for batch_size in args.batch_size:
+        run(f"bulk (batch {batch_size})", lambda db, c: insert_bulk(db, c, batch_size), corpus)
+
+
+if __name__ == "__main__":
+    main()
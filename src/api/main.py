@@ -3,7 +3,9 @@
 import sqlite3
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from fastapi import FastAPI, HTTPException, Header
+from datetime import datetime, timezone
+from fastapi import FastAPI, HTTPException, Header, Depends, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import os
@@ -16,12 +18,26 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from argumem import ArguMem
 from argumem.repositories.database import SourceRepository
 from argumem.db import clear_db
+from argumem.snapshot import backup_db, iter_export_gzip
+from argumem.tenancy import TenantRouter
 
 # Define a consistent, absolute path to the database at the project root.
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 DB_PATH = os.path.join(PROJECT_ROOT, "argumem.db")
+# Every other tenant gets its own database file in this directory.
+TENANTS_DIR = os.environ.get("ARGUMEM_TENANTS_DIR", os.path.join(PROJECT_ROOT, "tenants"))
+BACKUPS_DIR = os.environ.get("ARGUMEM_BACKUPS_DIR", os.path.join(PROJECT_ROOT, "backups"))
 
+# The default tenant keeps using the original single database file.
+router = TenantRouter(TENANTS_DIR, default_db_path=DB_PATH)
 
+# Characters of source text returned on each side of an aligned quotation.
+EXCERPT_CONTEXT = 150
+
+
+# Handlers that touch SQLite or the LLM are plain functions, so FastAPI runs
+# them in its threadpool instead of blocking the event loop. Each one checks
+# out its own connection from the router for the duration of the request.
 app = FastAPI(
     title="ArguMem API", 
     description="API for ArguMem argumentative memory system",
@@ -37,24 +53,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def get_tenant(x_argumem_tenant: str = Header(None, alias="X-ArguMem-Tenant")) -> str:
+    """Resolve the tenant of a request from the X-ArguMem-Tenant header."""
+    try:
+        return router.resolve(x_argumem_tenant)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # Initialize ArguMem instance with environment variable fallback
-def get_argumem_instance(api_key: str = None):
+def get_argumem_instance(api_key: str = None, tenant: str = None):
     """Get ArguMem instance with provided or environment API key."""
-    if api_key:
-        # Temporarily set the API key in environment for this request
-        original_key = os.environ.get('OPENAI_API_KEY')
-        os.environ['OPENAI_API_KEY'] = api_key
-        try:
-            instance = ArguMem(db_path=DB_PATH)
-            return instance
-        finally:
-            # Restore original key or remove if it wasn't set
-            if original_key:
-                os.environ['OPENAI_API_KEY'] = original_key
-            elif 'OPENAI_API_KEY' in os.environ:
-                del os.environ['OPENAI_API_KEY']
-    else:
-        return ArguMem(db_path=DB_PATH)
+    # The key is passed down rather than set in os.environ, which is shared
+    # by the requests running concurrently in the threadpool
+    return ArguMem(db_path=router.db_path(tenant), api_key=api_key or None)
 
 
 class MemoryRequest(BaseModel):
@@ -85,14 +97,15 @@ async def root():
 
 
 @app.post("/memories", response_model=MemoryResponse)
-async def add_memory(
+def add_memory(
     memory: MemoryRequest, 
-    x_openai_api_key: str = Header(None, alias="X-OpenAI-API-Key")
+    x_openai_api_key: str = Header(None, alias="X-OpenAI-API-Key"),
+    tenant: str = Depends(get_tenant)
 ):
     """Add a new memory to the database."""
     try:
         # Use provided API key or fall back to environment variable
-        argumem_instance = get_argumem_instance(x_openai_api_key)
+        argumem_instance = get_argumem_instance(x_openai_api_key, tenant)
         
         source_id = argumem_instance.addMemory(
             content=memory.content,
@@ -107,43 +120,62 @@ async def add_memory(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _count_rows(conn: sqlite3.Connection) -> DatabaseInfo:
+    """Count the rows of the main tables of one database."""
+    cursor = conn.cursor()
+    
+    # Get counts from each table
+    cursor.execute("SELECT COUNT(*) FROM sources")
+    sources_count = cursor.fetchone()[0]
+    
+    cursor.execute("SELECT COUNT(*) FROM quotations")
+    quotations_count = cursor.fetchone()[0]
+    
+    cursor.execute("SELECT COUNT(*) FROM propositions")
+    propositions_count = cursor.fetchone()[0]
+    
+    cursor.execute("SELECT COUNT(*) FROM arguments")
+    arguments_count = cursor.fetchone()[0]
+    
+    return DatabaseInfo(
+        total_sources=sources_count,
+        total_quotations=quotations_count,
+        total_propositions=propositions_count,
+        total_arguments=arguments_count
+    )
+
+
 @app.get("/database/info", response_model=DatabaseInfo)
-async def get_database_info():
+def get_database_info(tenant: str = Depends(get_tenant)):
     """Get database statistics."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        # Get counts from each table
-        cursor.execute("SELECT COUNT(*) FROM sources")
-        sources_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM quotations")
-        quotations_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM propositions")
-        propositions_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM arguments")
-        arguments_count = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        return DatabaseInfo(
-            total_sources=sources_count,
-            total_quotations=quotations_count,
-            total_propositions=propositions_count,
-            total_arguments=arguments_count
+        with router.connection(tenant) as conn:
+            return _count_rows(conn)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/admin/stats")
+def get_admin_stats():
+    """Get database statistics for every tenant and their totals."""
+    try:
+        per_tenant = router.fan_out(_count_rows)
+        totals = DatabaseInfo(
+            total_sources=sum(info.total_sources for info in per_tenant.values()),
+            total_quotations=sum(info.total_quotations for info in per_tenant.values()),
+            total_propositions=sum(info.total_propositions for info in per_tenant.values()),
+            total_arguments=sum(info.total_arguments for info in per_tenant.values())
         )
+        return {"tenants": per_tenant, "totals": totals}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/sources/recent")
-async def get_recent_sources():
+def get_recent_sources(tenant: str = Depends(get_tenant)):
     """Get the most recent sources."""
     try:
-        repo = SourceRepository(db_path=DB_PATH)
+        repo = SourceRepository(db_path=router.db_path(tenant))
         recent_sources = repo.get_recent(limit=10)
         return recent_sources
     except Exception as e:
@@ -151,68 +183,92 @@ async def get_recent_sources():
 
 
 @app.get("/sources")
-async def get_sources():
+def get_sources(tenant: str = Depends(get_tenant)):
     """Get all sources from the database."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row  # Return rows as dicts
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT id, created_at, last_edited, raw_text, context, title 
-            FROM sources 
-            ORDER BY last_edited DESC
-        """)
-        sources = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        with router.connection(tenant) as conn:
+            cursor = conn.cursor()
         
-        return sources
+            cursor.execute("""
+                SELECT id, created_at, last_edited, raw_text, context, title 
+                FROM sources 
+                ORDER BY last_edited DESC
+            """)
+            sources = [dict(row) for row in cursor.fetchall()]
+            return sources
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/sources/{source_id}/quotations")
-async def get_source_quotations(source_id: int):
+def get_source_quotations(source_id: int, tenant: str = Depends(get_tenant)):
     """Get all quotations for a specific source."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with router.connection(tenant) as conn:
+            cursor = conn.cursor()
+        
+            cursor.execute("""
+                SELECT id, quotation_text, locator, start_offset, end_offset, alignment
+                FROM quotations 
+                WHERE source_id = ?
+                ORDER BY id
+            """, (source_id,))
+            quotations = [dict(row) for row in cursor.fetchall()]
+            return quotations
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/sources/{source_id}/text")
+def get_source_text(
+    source_id: int,
+    start: int = 0,
+    end: Optional[int] = None,
+    tenant: str = Depends(get_tenant)
+):
+    """Get the slice [start, end) of a source's raw text, e.g. a quotation's offsets."""
+    if start < 0 or (end is not None and end < start):
+        raise HTTPException(status_code=400, detail="Invalid text range")
+    try:
+        with router.connection(tenant) as conn:
+            cursor = conn.cursor()
+        
+            # substr() is 1-based; a negative length would count backwards
+            cursor.execute("""
+                SELECT substr(raw_text, :start + 1, COALESCE(:end - :start, length(raw_text))) as text
+                FROM sources
+                WHERE id = :id
+            """, {"id": source_id, "start": start, "end": end})
+            row = cursor.fetchone()
         
-        cursor.execute("""
-            SELECT id, quotation_text, locator
-            FROM quotations 
-            WHERE source_id = ?
-            ORDER BY id
-        """, (source_id,))
-        quotations = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+            if not row:
+                raise HTTPException(status_code=404, detail=f"Source {source_id} not found")
         
-        return quotations
+            return {"source_id": source_id, "start": start, "end": start + len(row["text"]), "text": row["text"]}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/sources/{source_id}")
-async def get_source(source_id: int):
+def get_source(source_id: int, tenant: str = Depends(get_tenant)):
     """Get a specific source by ID."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with router.connection(tenant) as conn:
+            cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT id, created_at, last_edited, raw_text, context, title 
-            FROM sources 
-            WHERE id = ?
-        """, (source_id,))
-        source = cursor.fetchone()
+            cursor.execute("""
+                SELECT id, created_at, last_edited, raw_text, context, title 
+                FROM sources 
+                WHERE id = ?
+            """, (source_id,))
+            source = cursor.fetchone()
         
-        if not source:
-            raise HTTPException(status_code=404, detail=f"Source {source_id} not found")
+            if not source:
+                raise HTTPException(status_code=404, detail=f"Source {source_id} not found")
         
-        conn.close()
-        return dict(source)
+            return dict(source)
     except HTTPException:
         raise
     except Exception as e:
@@ -220,29 +276,55 @@ async def get_source(source_id: int):
 
 
 @app.get("/quotations/{quotation_id}")
-async def get_quotation(quotation_id: int):
-    """Get a specific quotation by ID with its source information."""
+def get_quotation(
+    quotation_id: int,
+    include_source_text: bool = True,
+    tenant: str = Depends(get_tenant)
+):
+    """
+    Get a specific quotation by ID with its source information.
+
+    source_excerpt holds the quotation with surrounding source text (or the
+    start of the source if the quotation is unaligned), beginning at
+    excerpt_offset. Pass include_source_text=false to skip the full text.
+    """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with router.connection(tenant) as conn:
+            cursor = conn.cursor()
+        
+            cursor.execute("""
+                SELECT q.id, q.quotation_text, q.locator,
+                       q.start_offset, q.end_offset, q.alignment,
+                       s.id as source_id, s.title as source_title, 
+                       s.context as source_context,
+                       s.created_at as source_created_at, s.last_edited as source_last_edited,
+                       CASE WHEN q.start_offset IS NULL THEN 0
+                            ELSE max(q.start_offset - :context, 0) END as excerpt_offset
+                FROM quotations q
+                JOIN sources s ON q.source_id = s.id
+                WHERE q.id = :id
+            """, {"id": quotation_id, "context": EXCERPT_CONTEXT})
+            quotation = cursor.fetchone()
         
-        cursor.execute("""
-            SELECT q.id, q.quotation_text, q.locator,
-                   s.id as source_id, s.title as source_title, 
-                   s.context as source_context, s.raw_text as source_text,
-                   s.created_at as source_created_at, s.last_edited as source_last_edited
-            FROM quotations q
-            JOIN sources s ON q.source_id = s.id
-            WHERE q.id = ?
-        """, (quotation_id,))
-        quotation = cursor.fetchone()
+            if not quotation:
+                raise HTTPException(status_code=404, detail=f"Quotation {quotation_id} not found")
         
-        if not quotation:
-            raise HTTPException(status_code=404, detail=f"Quotation {quotation_id} not found")
+            quotation = dict(quotation)
+            # substr() slices the text inside SQLite, so only the excerpt leaves the database
+            if quotation["start_offset"] is None:
+                excerpt_length = 2 * EXCERPT_CONTEXT
+            else:
+                excerpt_length = quotation["end_offset"] + EXCERPT_CONTEXT - quotation["excerpt_offset"]
+            columns = "substr(raw_text, ?, ?)" + (", raw_text" if include_source_text else "")
+            row = cursor.execute(
+                f"SELECT {columns} FROM sources WHERE id = ?",
+                (quotation["excerpt_offset"] + 1, excerpt_length, quotation["source_id"])
+            ).fetchone()
+            quotation["source_excerpt"] = row[0]
+            if include_source_text:
+                quotation["source_text"] = row[1]
         
-        conn.close()
-        return dict(quotation)
+            return quotation
     except HTTPException:
         raise
     except Exception as e:
@@ -250,109 +332,147 @@ async def get_quotation(quotation_id: int):
 
 
 @app.get("/quotations/{quotation_id}/propositions")
-async def get_quotation_propositions(quotation_id: int):
-    """Get all propositions for a specific quotation."""
+def get_quotation_propositions(quotation_id: int, tenant: str = Depends(get_tenant)):
+    """
+    Get the propositions a quotation supports or counters.
+
+    These are the propositions of the arguments the quotation is a premise
+    of (arguments.proposition_id), not the other propositions used as
+    premises alongside it in argument_proposition.
+    """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with router.connection(tenant) as conn:
+            cursor = conn.cursor()
         
-        # Note: Current schema doesn't link propositions directly to quotations
-        # This would require joining through argument_quotation and argument_proposition tables
-        # For now, return empty list since no propositions are created in the current implementation
-        cursor.execute("""
-            SELECT p.id, p.core_thesis as proposition_text, NULL as paraphrase
-            FROM propositions p
-            JOIN argument_proposition ap ON p.id = ap.proposition_id
-            JOIN arguments a ON ap.argument_id = a.id  
-            JOIN argument_quotation aq ON a.id = aq.argument_id
-            WHERE aq.quotation_id = ?
-            ORDER BY p.id
-        """, (quotation_id,))
-        propositions = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        
-        return propositions
+            # quotation_proposition materializes the quotation -> argument -> proposition
+            # the argument is about, so this is a single range scan on its primary key
+            cursor.execute("""
+                SELECT p.id, p.core_thesis as proposition_text, NULL as paraphrase,
+                       qp.polarity
+                FROM quotation_proposition qp
+                JOIN propositions p ON p.id = qp.proposition_id
+                WHERE qp.quotation_id = ?
+                ORDER BY p.id
+            """, (quotation_id,))
+            propositions = [dict(row) for row in cursor.fetchall()]
+            return propositions
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/quotations")
-async def get_all_quotations():
+def get_all_quotations(tenant: str = Depends(get_tenant)):
     """Get all quotations with their source information."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT q.id, q.quotation_text, q.locator,
-                   s.id as source_id, s.title as source_title, s.context as source_context
-            FROM quotations q
-            JOIN sources s ON q.source_id = s.id
-            ORDER BY s.last_edited DESC, q.id
-        """)
-        quotations = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        with router.connection(tenant) as conn:
+            cursor = conn.cursor()
         
-        return quotations
+            cursor.execute("""
+                SELECT q.id, q.quotation_text, q.locator,
+                       q.start_offset, q.end_offset, q.alignment,
+                       s.id as source_id, s.title as source_title, s.context as source_context
+                FROM quotations q
+                JOIN sources s ON q.source_id = s.id
+                ORDER BY s.last_edited DESC, q.id
+            """)
+            quotations = [dict(row) for row in cursor.fetchall()]
+            return quotations
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/recent")
-async def get_recent_items():
+def get_recent_items(tenant: str = Depends(get_tenant)):
     """Get recently added items from all tables."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with router.connection(tenant) as conn:
+            cursor = conn.cursor()
         
-        # Get recent sources
-        cursor.execute("""
-            SELECT 'source' as type, id, created_at, title, 
-                   substr(raw_text, 1, 200) as preview,
-                   raw_text as content, context
-            FROM sources 
-            ORDER BY created_at DESC 
-            LIMIT 10
-        """)
-        sources = [dict(row) for row in cursor.fetchall()]
+            # Get recent sources
+            cursor.execute("""
+                SELECT 'source' as type, id, created_at, title, 
+                       substr(raw_text, 1, 200) as preview,
+                       raw_text as content, context
+                FROM sources 
+                ORDER BY created_at DESC 
+                LIMIT 10
+            """)
+            sources = [dict(row) for row in cursor.fetchall()]
         
-        # Get recent quotations with source info
-        cursor.execute("""
-            SELECT 'quotation' as type, q.id, s.created_at, 
-                   'Quotation from: ' || COALESCE(s.title, 'Source #' || s.id) as title,
-                   substr(q.quotation_text, 1, 200) as preview,
-                   q.quotation_text as content, q.locator,
-                   s.id as source_id, s.title as source_title
-            FROM quotations q
-            JOIN sources s ON q.source_id = s.id
-            ORDER BY s.created_at DESC, q.id DESC
-            LIMIT 10
-        """)
-        quotations = [dict(row) for row in cursor.fetchall()]
+            # Get recent quotations with source info
+            cursor.execute("""
+                SELECT 'quotation' as type, q.id, s.created_at, 
+                       'Quotation from: ' || COALESCE(s.title, 'Source #' || s.id) as title,
+                       substr(q.quotation_text, 1, 200) as preview,
+                       q.quotation_text as content, q.locator,
+                       q.start_offset, q.end_offset, q.alignment,
+                       s.id as source_id, s.title as source_title
+                FROM quotations q
+                JOIN sources s ON q.source_id = s.id
+                ORDER BY s.created_at DESC, q.id DESC
+                LIMIT 10
+            """)
+            quotations = [dict(row) for row in cursor.fetchall()]
         
-        # Get recent propositions with quotation info
-        # Note: Current schema doesn't directly link propositions to quotations
-        # Skip propositions for now since none are created in current implementation
-        propositions = []
+            # Get recent propositions that are linked to a quotation
+            cursor.execute("""
+                SELECT 'proposition' as type, p.id, p.created_at,
+                       'Proposition #' || p.id as title,
+                       substr(p.core_thesis, 1, 200) as preview,
+                       p.core_thesis as content,
+                       (SELECT MIN(qp.quotation_id) FROM quotation_proposition qp
+                        WHERE qp.proposition_id = p.id) as quotation_id
+                FROM propositions p
+                WHERE EXISTS (SELECT 1 FROM quotation_proposition qp WHERE qp.proposition_id = p.id)
+                ORDER BY p.created_at DESC
+                LIMIT 10
+            """)
+            propositions = [dict(row) for row in cursor.fetchall()]
         
-        # Combine and sort all items by created_at
-        all_items = sources + quotations + propositions
-        all_items.sort(key=lambda x: x['created_at'], reverse=True)
+            # Combine and sort all items by created_at
+            all_items = sources + quotations + propositions
+            all_items.sort(key=lambda x: x['created_at'], reverse=True)
         
-        conn.close()
-        return all_items[:20]  # Return top 20 most recent items
+            return all_items[:20]  # Return top 20 most recent items
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/database/export")
+def export_database(tenant: str = Depends(get_tenant)):
+    """Stream a gzip-compressed JSONL snapshot of the database."""
+    try:
+        db_path = router.db_path(tenant)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    # Starlette resumes the generator on threadpool workers, one chunk at a time;
+    # it uses its own connection that isn't bound to a single thread
+    return StreamingResponse(
+        iter_export_gzip(db_path),
+        media_type="application/gzip",
+        headers={"Content-Disposition": f'attachment; filename="argumem-{tenant}.jsonl.gz"'}
+    )
+
+
+@app.post("/database/backup")
+def backup_database(background_tasks: BackgroundTasks, tenant: str = Depends(get_tenant)):
+    """Start an online backup of the database; it runs in steps after the response is sent."""
+    try:
+        db_path = router.db_path(tenant)
+        os.makedirs(BACKUPS_DIR, exist_ok=True)
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        backup_path = os.path.join(BACKUPS_DIR, f"{tenant}-{timestamp}.db")
+        background_tasks.add_task(backup_db, db_path, backup_path)
+        return {"message": "Backup started", "path": backup_path}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.delete("/database")
-async def clear_database():
+def clear_database(tenant: str = Depends(get_tenant)):
     """Clear all data from the database."""
     try:
-        clear_db(DB_PATH)
+        clear_db(router.db_path(tenant))
         return {"message": "Database cleared successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
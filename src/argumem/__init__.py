@@ -1,6 +1,7 @@
 """ArguMem package."""
 
 from .argumem import ArguMem
+from .cli import main
 
-__all__ = ["ArguMem"]
+__all__ = ["ArguMem", "main"]
 
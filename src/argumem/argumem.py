@@ -4,9 +4,10 @@ from typing import Optional
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from .db import init_db, get_db
+from .db import ensure_db, get_db, transaction
 from .services.extraction import QuotationExtractor
 from .services.text_processing import TextProcessor
+from .services.alignment import QuotationAligner
 from .repositories.database import SourceRepository, QuotationRepository
 
 
@@ -20,26 +21,27 @@ class ArguMem:
         >>> memories = mem.getMemory(query="AI")
     """
     
-    def __init__(self, db_path: str = "argumem.db"):
+    def __init__(self, db_path: str = "argumem.db", api_key: Optional[str] = None):
         """
         Initialize ArguMem with a database location.
         
         Args:
             db_path: Path to the SQLite database file
+            api_key: OpenAI API key (defaults to the OPENAI_API_KEY environment variable)
         """
         self.db_path = db_path
         self._ensure_db_initialized()
         
         # Initialize services and repositories
-        self.extractor = QuotationExtractor()
+        self.extractor = QuotationExtractor(api_key=api_key)
         self.text_processor = TextProcessor()
+        self.aligner = QuotationAligner()
         self.source_repo = SourceRepository(db_path)
         self.quotation_repo = QuotationRepository(db_path)
     
     def _ensure_db_initialized(self):
-        """Initialize database if it doesn't exist."""
-        if not Path(self.db_path).exists():
-            init_db(self.db_path)
+        """Initialize the database if it doesn't exist and apply pending migrations."""
+        ensure_db(self.db_path)
     
     def addMemory(
         self, 
@@ -82,11 +84,13 @@ class ArguMem:
         # Remove duplicates
         unique_quotations = self.text_processor.remove_duplicate_quotations(all_quotations)
         
-        # Create source in database
-        source_id = self.source_repo.create(content, context, title, timestamp)
+        # Locate quotations in the source; those that can't be found are flagged 'unaligned'
+        unique_quotations = self.aligner.align(content, unique_quotations)
         
-        # Create quotations in database
-        self.quotation_repo.create_many(unique_quotations, source_id)
+        # Create the source and its quotations in a single transaction
+        with transaction(self.db_path) as conn:
+            source_id = self.source_repo.create(content, context, title, timestamp, conn=conn)
+            self.quotation_repo.create_many(unique_quotations, source_id, conn=conn)
         
         return source_id
     
@@ -0,0 +1,65 @@
+"""Command line interface for database maintenance."""
+
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from .db import ensure_db, rebuild_quotation_propositions
+from .repositories.database import SourceRepository, QuotationRepository
+from .services.alignment import QuotationAligner
+from .snapshot import backup_db, export_snapshot, import_snapshot
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point of the ``argumem`` command."""
+    parser = argparse.ArgumentParser(prog="argumem", description="ArguMem database maintenance")
+    parser.add_argument("--db", default="argumem.db", help="Path to the SQLite database file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("migrate", help="Create the database or apply pending migrations")
+    subparsers.add_parser("rebuild-links", help="Rebuild the materialized quotation-proposition links")
+    subparsers.add_parser("align", help="Recompute the source offsets of all quotations")
+    export_parser = subparsers.add_parser("export", help="Export the database to a .jsonl.gz snapshot")
+    export_parser.add_argument("path", help="Snapshot file to write")
+    import_parser = subparsers.add_parser("import", help="Import a .jsonl.gz snapshot into an empty database")
+    import_parser.add_argument("path", help="Snapshot file to read")
+    backup_parser = subparsers.add_parser("backup", help="Copy the live database with the online backup API")
+    backup_parser.add_argument("path", help="Backup file to write")
+    backup_parser.add_argument("--pages", type=int, default=256, help="Pages copied per step")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        ensure_db(args.db)
+        print(f"Database {args.db} is up to date")
+    elif args.command == "rebuild-links":
+        ensure_db(args.db)
+        count = rebuild_quotation_propositions(args.db)
+        print(f"Rebuilt {count} quotation-proposition links in {args.db}")
+    elif args.command == "align":
+        ensure_db(args.db)
+        source_repo = SourceRepository(args.db)
+        quotation_repo = QuotationRepository(args.db)
+        aligner = QuotationAligner()
+        unaligned = 0
+        for source_id in source_repo.get_ids():
+            quotations = aligner.align(
+                source_repo.get_raw_text(source_id), quotation_repo.get_by_source(source_id)
+            )
+            quotation_repo.update_alignments(quotations)
+            unaligned += sum(q["alignment"] == "unaligned" for q in quotations)
+        print(f"Aligned quotations in {args.db} ({unaligned} could not be located)")
+    elif args.command == "export":
+        if not Path(args.db).is_file():
+            parser.error(f"database {args.db} does not exist")
+        count = export_snapshot(args.db, args.path)
+        print(f"Exported {count} rows from {args.db} to {args.path}")
+    elif args.command == "import":
+        ensure_db(args.db)
+        count = import_snapshot(args.path, args.db)
+        print(f"Imported {count} rows from {args.path} into {args.db}")
+    elif args.command == "backup":
+        if not Path(args.db).is_file():
+            parser.error(f"database {args.db} does not exist")
+        backup_db(args.db, args.path, pages=args.pages)
+        print(f"Backed up {args.db} to {args.path}")
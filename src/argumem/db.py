@@ -1,8 +1,22 @@
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, Iterator
 
 
 SCHEMA_PATH = Path(__file__).with_name("schema.sql")
+MIGRATIONS_DIR = Path(__file__).with_name("migrations")
+
+# Version of the schema in schema.sql. Bump it together with a new entry in
+# MIGRATIONS whenever the schema changes, so existing databases can catch up.
+SCHEMA_VERSION = 3
+
+# Maps a schema version to the script in MIGRATIONS_DIR that upgrades a
+# database from the previous version to it.
+MIGRATIONS: Dict[int, str] = {
+    2: "0002_quotation_proposition.sql",
+    3: "0003_quotation_offsets.sql",
+}
 
 
 def get_db(db_path: str = "argumem.db") -> sqlite3.Connection:
@@ -11,20 +25,156 @@ def get_db(db_path: str = "argumem.db") -> sqlite3.Connection:
     return conn
 
 
+@contextmanager
+def transaction(db_path: str = "argumem.db") -> Iterator[sqlite3.Connection]:
+    """
+    Open a connection whose writes are committed together on exit.
+
+    The transaction is rolled back if the block raises. Repository methods
+    accept the yielded connection to take part in the transaction.
+
+    Example:
+        >>> with transaction("argumem.db") as conn:
+        ...     source_id = SourceRepository("argumem.db").create("text", "ctx", conn=conn)
+        ...     QuotationRepository("argumem.db").create_many(quotations, source_id, conn=conn)
+    """
+    conn = get_db(db_path)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
 def init_db(db_path: str = "argumem.db") -> sqlite3.Connection:
     conn = get_db(db_path)
-    with SCHEMA_PATH.open("r", encoding="utf-8") as f:
-        conn.executescript(f.read())
+    migrate_db(conn)
     return conn
 
 
+def migrate_db(conn: sqlite3.Connection) -> None:
+    """
+    Bring a database up to SCHEMA_VERSION.
+
+    Empty databases get the full schema; databases created before versioning
+    (user_version 0 with existing tables) are treated as version 1. The
+    version is read and every migration applied together with its version
+    bump inside one write transaction, so concurrent processes opening the
+    same database never apply a migration twice. Up-to-date databases are
+    detected before that, so opening them never waits for the write lock.
+
+    Raises:
+        RuntimeError: If the database was created by a newer schema version
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(
+                f"Database schema version {version} is newer than the supported version {SCHEMA_VERSION}"
+            )
+        if version == 0:
+            has_schema = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sources'"
+            ).fetchone()
+            if has_schema:
+                version = 1
+            else:
+                _execute_script(conn, SCHEMA_PATH)
+                version = SCHEMA_VERSION
+                conn.execute(f"PRAGMA user_version = {version}")
+
+        for target in range(version + 1, SCHEMA_VERSION + 1):
+            _execute_script(conn, MIGRATIONS_DIR / MIGRATIONS[target])
+            conn.execute(f"PRAGMA user_version = {target}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def _execute_script(conn: sqlite3.Connection, path: Path) -> None:
+    """
+    Run the statements of an SQL file inside the current transaction.
+
+    Unlike executescript(), this doesn't commit the pending transaction first.
+    """
+    statement = ""
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            statement += line
+            if sqlite3.complete_statement(statement):
+                conn.execute(statement)
+                statement = ""
+    if statement.strip():
+        raise ValueError(f"Incomplete SQL statement at the end of {path.name}")
+
+
+def ensure_db(db_path: str = "argumem.db") -> None:
+    """Create the database if needed and apply any pending migrations."""
+    conn = get_db(db_path)
+    try:
+        migrate_db(conn)
+    finally:
+        conn.close()
+
+
+def rebuild_quotation_propositions(db_path: str = "argumem.db") -> int:
+    """
+    Rebuild the materialized quotation_proposition links from the arguments.
+
+    The links are kept up to date by triggers; this recomputes them from
+    scratch, e.g. after importing data with triggers disabled.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        The number of links written
+    """
+    conn = get_db(db_path)
+
+    try:
+        count = refresh_quotation_propositions(conn)
+        conn.commit()
+        return count
+    finally:
+        conn.close()
+
+
+def refresh_quotation_propositions(conn: sqlite3.Connection) -> int:
+    """
+    Recompute the quotation_proposition links within the caller's transaction.
+
+    Args:
+        conn: Connection to the database; the caller commits
+
+    Returns:
+        The number of links written
+    """
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM quotation_proposition")
+    cursor.execute("""
+        INSERT INTO quotation_proposition (quotation_id, proposition_id, polarity, argument_count)
+        SELECT aq.quotation_id, a.proposition_id, a.polarity, COUNT(*)
+        FROM argument_quotation aq
+        JOIN arguments a ON a.id = aq.argument_id
+        GROUP BY aq.quotation_id, a.proposition_id, a.polarity
+    """)
+    return cursor.rowcount
+
+
 def clear_db(db_path: str = "argumem.db"):
     """Clear all data from the database."""
     conn = get_db(db_path)
     cursor = conn.cursor()
-    
+
     try:
         # Delete all data from tables
+        cursor.execute("DELETE FROM quotation_proposition")
         cursor.execute("DELETE FROM argument_proposition")
         cursor.execute("DELETE FROM argument_quotation")
         cursor.execute("DELETE FROM arguments")
@@ -38,7 +188,7 @@ def clear_db(db_path: str = "argumem.db"):
         except sqlite3.OperationalError:
             # sqlite_sequence table doesn't exist yet (no auto-increment tables used)
             pass
-        
+
         conn.commit()
     finally:
         conn.close()
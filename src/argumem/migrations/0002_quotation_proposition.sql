@@ -0,0 +1,68 @@
+ALTER TABLE arguments
+  ADD COLUMN polarity TEXT NOT NULL DEFAULT 'support' CHECK (polarity IN ('support', 'counter'));
+
+-- Materialized quotation -> proposition links: a quotation is linked to the
+-- proposition of every argument it is a premise of, with that argument's
+-- polarity. Maintained by the triggers below; argument_count tracks how many
+-- arguments back the link so it disappears with the last one.
+CREATE TABLE quotation_proposition (
+  quotation_id INTEGER NOT NULL REFERENCES quotations(id) ON DELETE CASCADE,
+  proposition_id INTEGER NOT NULL REFERENCES propositions(id) ON DELETE CASCADE,
+  polarity TEXT NOT NULL,
+  argument_count INTEGER NOT NULL DEFAULT 1,
+  PRIMARY KEY (quotation_id, proposition_id, polarity)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_quotation_proposition_proposition
+  ON quotation_proposition (proposition_id, quotation_id);
+
+CREATE TRIGGER trg_argument_quotation_insert AFTER INSERT ON argument_quotation
+BEGIN
+  INSERT INTO quotation_proposition (quotation_id, proposition_id, polarity)
+    SELECT NEW.quotation_id, a.proposition_id, a.polarity
+    FROM arguments a WHERE a.id = NEW.argument_id
+    ON CONFLICT (quotation_id, proposition_id, polarity)
+    DO UPDATE SET argument_count = argument_count + 1;
+END;
+
+CREATE TRIGGER trg_argument_quotation_delete AFTER DELETE ON argument_quotation
+BEGIN
+  UPDATE quotation_proposition SET argument_count = argument_count - 1
+    WHERE (quotation_id, proposition_id, polarity) IN (
+      SELECT OLD.quotation_id, a.proposition_id, a.polarity
+      FROM arguments a WHERE a.id = OLD.argument_id
+    );
+  DELETE FROM quotation_proposition
+    WHERE quotation_id = OLD.quotation_id AND argument_count <= 0;
+END;
+
+CREATE TRIGGER trg_arguments_update AFTER UPDATE OF proposition_id, polarity ON arguments
+BEGIN
+  UPDATE quotation_proposition SET argument_count = argument_count - 1
+    WHERE proposition_id = OLD.proposition_id AND polarity = OLD.polarity
+      AND quotation_id IN (SELECT quotation_id FROM argument_quotation WHERE argument_id = OLD.id);
+  DELETE FROM quotation_proposition
+    WHERE proposition_id = OLD.proposition_id AND argument_count <= 0;
+  INSERT INTO quotation_proposition (quotation_id, proposition_id, polarity)
+    SELECT aq.quotation_id, NEW.proposition_id, NEW.polarity
+    FROM argument_quotation aq WHERE aq.argument_id = NEW.id
+    ON CONFLICT (quotation_id, proposition_id, polarity)
+    DO UPDATE SET argument_count = argument_count + 1;
+END;
+
+-- Deleting an argument cascades to argument_quotation only after the argument
+-- row is gone, so its links are released here while it can still be read.
+CREATE TRIGGER trg_arguments_delete BEFORE DELETE ON arguments
+BEGIN
+  UPDATE quotation_proposition SET argument_count = argument_count - 1
+    WHERE proposition_id = OLD.proposition_id AND polarity = OLD.polarity
+      AND quotation_id IN (SELECT quotation_id FROM argument_quotation WHERE argument_id = OLD.id);
+  DELETE FROM quotation_proposition
+    WHERE proposition_id = OLD.proposition_id AND argument_count <= 0;
+END;
+
+INSERT INTO quotation_proposition (quotation_id, proposition_id, polarity, argument_count)
+  SELECT aq.quotation_id, a.proposition_id, a.polarity, COUNT(*)
+  FROM argument_quotation aq
+  JOIN arguments a ON a.id = aq.argument_id
+  GROUP BY aq.quotation_id, a.proposition_id, a.polarity;
@@ -0,0 +1,6 @@
+ALTER TABLE quotations ADD COLUMN start_offset INTEGER;
+ALTER TABLE quotations ADD COLUMN end_offset INTEGER;
+ALTER TABLE quotations
+  ADD COLUMN alignment TEXT CHECK (alignment IN ('exact', 'normalized', 'fuzzy', 'unaligned'));
+
+CREATE INDEX idx_quotations_source_offset ON quotations (source_id, start_offset);
@@ -1,9 +1,55 @@
-"""Database repository for sources and quotations."""
+"""Database repositories for sources, quotations, propositions and arguments."""
 
-from typing import Optional, List, Dict
+from contextlib import contextmanager
+from itertools import batched
+from typing import Optional, List, Dict, Iterator, Sequence, Tuple
 import sqlite3
 
-from ..db import get_db
+from ..db import get_db, transaction
+
+# Rows per multi-row INSERT statement in the bulk write methods.
+DEFAULT_BATCH_SIZE = 500
+
+# SQLite's default limit on bound parameters per statement (SQLITE_MAX_VARIABLE_NUMBER).
+MAX_VARIABLES = 32766
+
+
+@contextmanager
+def _connection(db_path: str, conn: Optional[sqlite3.Connection]) -> Iterator[sqlite3.Connection]:
+    """Use the caller's connection and transaction if given, else a transaction of our own."""
+    if conn is not None:
+        yield conn
+    else:
+        with transaction(db_path) as own:
+            yield own
+
+
+def _insert_returning_ids(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: Sequence[Tuple],
+    batch_size: int
+) -> List[int]:
+    """
+    Insert rows with multi-row INSERT ... RETURNING statements.
+
+    Returns:
+        The new row IDs, in the order of rows
+    """
+    batch_size = max(1, min(batch_size, MAX_VARIABLES // len(columns)))
+    placeholders = "(" + ", ".join("?" for _ in columns) + ")"
+    ids: List[int] = []
+    for batch in batched(rows, batch_size):
+        cursor = conn.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES {', '.join(placeholders for _ in batch)} RETURNING id",
+            [value for row in batch for value in row]
+        )
+        # RETURNING yields rows in no guaranteed order, but new rowids ascend
+        # in insertion order, so sorting restores the order of the batch
+        ids.extend(sorted(row[0] for row in cursor.fetchall()))
+    return ids
 
 
 class SourceRepository:
@@ -17,7 +63,8 @@ class SourceRepository:
         content: str, 
         context: str, 
         title: Optional[str] = None, 
-        timestamp: Optional[str] = None
+        timestamp: Optional[str] = None,
+        conn: Optional[sqlite3.Connection] = None
     ) -> int:
         """
         Create a source in the database.
@@ -27,25 +74,48 @@ class SourceRepository:
             context: Context information  
             title: Optional title
             timestamp: Optional custom timestamp (unused, for compatibility)
+            conn: Optional connection of a caller-controlled transaction;
+                without it the source is committed right away
             
         Returns:
             The ID of the created source
         """
-        conn = get_db(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
+        with _connection(self.db_path, conn) as conn:
             # Note: timestamp parameter is ignored since the database uses auto-generated timestamps
-            cursor.execute(
+            cursor = conn.execute(
                 "INSERT INTO sources (raw_text, context, title) VALUES (?, ?, ?)",
                 (content, context, title)
             )
+            return cursor.lastrowid
+
+    def create_many(
+        self,
+        sources: List[Dict[str, str]],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        conn: Optional[sqlite3.Connection] = None
+    ) -> List[int]:
+        """
+        Create multiple sources in the database.
+        
+        Args:
+            sources: List of source dicts with 'content', 'context' and optionally 'title' keys
+            batch_size: Number of rows per INSERT statement
+            conn: Optional connection of a caller-controlled transaction
             
-            source_id = cursor.lastrowid
-            conn.commit()
-            return source_id
-        finally:
-            conn.close()
+        Returns:
+            The IDs of the created sources, in input order
+        """
+        if not sources:
+            return []
+        
+        with _connection(self.db_path, conn) as conn:
+            return _insert_returning_ids(
+                conn,
+                "sources",
+                ("raw_text", "context", "title"),
+                [(s["content"], s.get("context"), s.get("title")) for s in sources],
+                batch_size
+            )
 
     def get_recent(self, limit: int = 10) -> List[Dict]:
         """
@@ -72,6 +142,36 @@ class SourceRepository:
         finally:
             conn.close()
 
+    def get_ids(self) -> List[int]:
+        """
+        Get the IDs of all sources.
+        
+        Returns:
+            A list of source IDs in ascending order
+        """
+        conn = get_db(self.db_path)
+        try:
+            return [row[0] for row in conn.execute("SELECT id FROM sources ORDER BY id")]
+        finally:
+            conn.close()
+
+    def get_raw_text(self, source_id: int) -> Optional[str]:
+        """
+        Get the raw text of a source.
+        
+        Args:
+            source_id: ID of the source
+            
+        Returns:
+            The raw text, or None if the source doesn't exist
+        """
+        conn = get_db(self.db_path)
+        try:
+            row = conn.execute("SELECT raw_text FROM sources WHERE id = ?", (source_id,)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
 
 class QuotationRepository:
     """Repository for quotation database operations."""
@@ -79,26 +179,199 @@ class QuotationRepository:
     def __init__(self, db_path: str = "argumem.db"):
         self.db_path = db_path
     
-    def create_many(self, quotations: List[Dict[str, str]], source_id: int) -> None:
+    def create_many(
+        self,
+        quotations: List[Dict[str, str]],
+        source_id: int,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        conn: Optional[sqlite3.Connection] = None
+    ) -> List[int]:
         """
         Create multiple quotations in the database.
         
         Args:
-            quotations: List of quotation dicts with 'text' and 'locator' keys
+            quotations: List of quotation dicts with 'text' and 'locator' keys,
+                and optionally 'start_offset', 'end_offset' and 'alignment'
             source_id: ID of the source these quotations belong to
+            batch_size: Number of rows per INSERT statement
+            conn: Optional connection of a caller-controlled transaction
+            
+        Returns:
+            The IDs of the created quotations, in input order
         """
         if not quotations:
-            return
+            return []
+        
+        with _connection(self.db_path, conn) as conn:
+            return _insert_returning_ids(
+                conn,
+                "quotations",
+                ("source_id", "quotation_text", "locator", "start_offset", "end_offset", "alignment"),
+                [
+                    (
+                        source_id,
+                        quotation["text"],
+                        quotation.get("locator"),
+                        quotation.get("start_offset"),
+                        quotation.get("end_offset"),
+                        quotation.get("alignment"),
+                    )
+                    for quotation in quotations
+                ],
+                batch_size
+            )
+
+    def get_by_source(self, source_id: int) -> List[Dict]:
+        """
+        Get all quotations of a source.
         
+        Args:
+            source_id: ID of the source
+            
+        Returns:
+            A list of quotation dicts with 'id', 'text' and 'locator' keys
+        """
         conn = get_db(self.db_path)
-        cursor = conn.cursor()
+        try:
+            rows = conn.execute(
+                "SELECT id, quotation_text, locator FROM quotations WHERE source_id = ? ORDER BY id",
+                (source_id,)
+            ).fetchall()
+            return [{"id": row[0], "text": row[1], "locator": row[2]} for row in rows]
+        finally:
+            conn.close()
+
+    def update_alignments(self, quotations: List[Dict]) -> None:
+        """
+        Store the alignment of existing quotations.
+        
+        Args:
+            quotations: List of quotation dicts with 'id', 'start_offset',
+                'end_offset' and 'alignment' keys
+        """
+        if not quotations:
+            return
         
+        conn = get_db(self.db_path)
         try:
-            for quotation in quotations:
-                cursor.execute(
-                    "INSERT INTO quotations (source_id, quotation_text, locator) VALUES (?, ?, ?)",
-                    (source_id, quotation["text"], quotation.get("locator"))
-                )
+            conn.executemany(
+                "UPDATE quotations SET start_offset = ?, end_offset = ?, alignment = ? WHERE id = ?",
+                [(q["start_offset"], q["end_offset"], q["alignment"], q["id"]) for q in quotations]
+            )
             conn.commit()
         finally:
             conn.close()
+
+
+class PropositionRepository:
+    """Repository for proposition database operations."""
+    
+    def __init__(self, db_path: str = "argumem.db"):
+        self.db_path = db_path
+    
+    def create_many(
+        self,
+        theses: List[str],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        conn: Optional[sqlite3.Connection] = None
+    ) -> List[int]:
+        """
+        Create multiple propositions in the database.
+        
+        Args:
+            theses: List of core theses
+            batch_size: Number of rows per INSERT statement
+            conn: Optional connection of a caller-controlled transaction
+            
+        Returns:
+            The IDs of the created propositions, in input order
+        """
+        if not theses:
+            return []
+        
+        with _connection(self.db_path, conn) as conn:
+            return _insert_returning_ids(
+                conn, "propositions", ("core_thesis",), [(thesis,) for thesis in theses], batch_size
+            )
+
+
+class ArgumentRepository:
+    """Repository for argument database operations and their premise links."""
+    
+    def __init__(self, db_path: str = "argumem.db"):
+        self.db_path = db_path
+    
+    def create_many(
+        self,
+        arguments: List[Dict],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        conn: Optional[sqlite3.Connection] = None
+    ) -> List[int]:
+        """
+        Create multiple arguments in the database.
+        
+        Args:
+            arguments: List of argument dicts with a 'proposition_id' key and
+                optionally 'argument_text' and 'polarity' ('support' or 'counter')
+            batch_size: Number of rows per INSERT statement
+            conn: Optional connection of a caller-controlled transaction
+            
+        Returns:
+            The IDs of the created arguments, in input order
+        """
+        if not arguments:
+            return []
+        
+        with _connection(self.db_path, conn) as conn:
+            return _insert_returning_ids(
+                conn,
+                "arguments",
+                ("proposition_id", "argument_text", "polarity"),
+                [
+                    (a["proposition_id"], a.get("argument_text"), a.get("polarity", "support"))
+                    for a in arguments
+                ],
+                batch_size
+            )
+    
+    def link_quotations(
+        self,
+        links: List[Tuple[int, int]],
+        conn: Optional[sqlite3.Connection] = None
+    ) -> None:
+        """
+        Add quotations as premises of arguments.
+        
+        Args:
+            links: List of (argument_id, quotation_id) pairs
+            conn: Optional connection of a caller-controlled transaction
+        """
+        if not links:
+            return
+        
+        with _connection(self.db_path, conn) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO argument_quotation (argument_id, quotation_id) VALUES (?, ?)",
+                links
+            )
+    
+    def link_propositions(
+        self,
+        links: List[Tuple[int, int]],
+        conn: Optional[sqlite3.Connection] = None
+    ) -> None:
+        """
+        Add propositions as premises of arguments.
+        
+        Args:
+            links: List of (argument_id, proposition_id) pairs
+            conn: Optional connection of a caller-controlled transaction
+        """
+        if not links:
+            return
+        
+        with _connection(self.db_path, conn) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO argument_proposition (argument_id, proposition_id) VALUES (?, ?)",
+                links
+            )
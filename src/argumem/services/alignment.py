@@ -0,0 +1,234 @@
+"""Alignment of extracted quotations to character offsets in their source."""
+
+import re
+from collections import Counter, defaultdict, deque
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Characters LLMs commonly substitute when quoting, mapped to their plain form
+_CHAR_MAP = {
+    "‘": "'", "’": "'", "‚": "'", "‛": "'",
+    "“": '"', "”": '"', "„": '"', "‟": '"',
+    "–": "-", "—": "-", "−": "-",
+    "…": "...", " ": " ",
+}
+
+_WORD = re.compile(r"\S+")
+
+# Words occurring more often than this in a source are too common to anchor
+# a fuzzy match, like difflib's autojunk heuristic
+MAX_ANCHOR_OCCURRENCES = 64
+
+
+class AhoCorasick:
+    """Multi-pattern matcher finding all patterns in a single pass over a text."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = [p for p in patterns if p]
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(index)
+
+        # Breadth-first pass to set failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def first_matches(self, text: str) -> Dict[int, int]:
+        """
+        Find the first occurrence of every pattern in text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Mapping of pattern index to the start offset of its first match
+        """
+        found: Dict[int, int] = {}
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for index in self._out[node]:
+                if index not in found:
+                    found[index] = position - len(self.patterns[index]) + 1
+            if len(found) == len(self.patterns):
+                break
+        return found
+
+
+def normalize_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """
+    Normalize text for lenient matching, keeping track of original offsets.
+
+    Case is folded, typographic quotes and dashes are replaced by their plain
+    forms and runs of whitespace collapse to a single space.
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        The normalized text and, for each of its characters, the offset of
+        the original character it came from
+    """
+    chars: List[str] = []
+    offsets: List[int] = []
+    for position, char in enumerate(text):
+        if char.isspace():
+            if chars and chars[-1] != " ":
+                chars.append(" ")
+                offsets.append(position)
+            continue
+        for normalized in _CHAR_MAP.get(char, char).casefold():
+            chars.append(normalized)
+            offsets.append(position)
+    return "".join(chars), offsets
+
+
+class QuotationAligner:
+    """Service for locating quotations in the raw text of their source."""
+
+    def __init__(self, fuzzy_threshold: float = 0.85, max_candidates: int = 3):
+        """
+        Args:
+            fuzzy_threshold: Minimum similarity (matched characters relative
+                to the lengths of the quotation and the matched span, as in
+                difflib's ratio) for a fuzzy alignment to be accepted
+            max_candidates: Maximum number of windows of the source compared
+                with each quotation during fuzzy matching
+        """
+        self.fuzzy_threshold = fuzzy_threshold
+        self.max_candidates = max_candidates
+
+    def align(self, raw_text: str, quotations: List[Dict]) -> List[Dict]:
+        """
+        Attach exact character offsets to quotations.
+
+        All quotations are first matched verbatim in one pass, then the rest
+        in one pass over a normalized form of the text, and finally one by
+        one with fuzzy matching. Fuzzy matching only compares a quotation
+        against the few windows of the text that share the most words with
+        it, so its cost doesn't grow with the length of the source.
+
+        Args:
+            raw_text: Full text of the source
+            quotations: List of quotation dicts with a 'text' key
+
+        Returns:
+            Copies of the quotations with 'start_offset', 'end_offset' and
+            'alignment' ('exact', 'normalized', 'fuzzy' or 'unaligned') set
+        """
+        aligned = [dict(q, start_offset=None, end_offset=None, alignment="unaligned") for q in quotations]
+
+        exact = AhoCorasick(q["text"] for q in aligned)
+        exact_index = [i for i, q in enumerate(aligned) if q["text"]]
+        for index, start in exact.first_matches(raw_text).items():
+            quotation = aligned[exact_index[index]]
+            quotation.update(
+                start_offset=start,
+                end_offset=start + len(quotation["text"]),
+                alignment="exact",
+            )
+
+        pending = [q for q in aligned if q["alignment"] == "unaligned" and q["text"].strip()]
+        if not pending:
+            return aligned
+
+        norm_text, offsets = normalize_with_offsets(raw_text)
+        norm_patterns = [normalize_with_offsets(q["text"])[0].strip() for q in pending]
+        normalized = AhoCorasick(norm_patterns)
+        normalized_index = [i for i, p in enumerate(norm_patterns) if p]
+        for index, start in normalized.first_matches(norm_text).items():
+            pattern_index = normalized_index[index]
+            end = start + len(norm_patterns[pattern_index])
+            pending[pattern_index].update(
+                start_offset=offsets[start],
+                end_offset=offsets[end - 1] + 1,
+                alignment="normalized",
+            )
+
+        word_positions = _word_positions(norm_text)
+        for quotation, pattern in zip(pending, norm_patterns):
+            if quotation["alignment"] != "unaligned" or not pattern:
+                continue
+            span = self._fuzzy_span(norm_text, pattern, word_positions)
+            if span:
+                quotation.update(
+                    start_offset=offsets[span[0]],
+                    end_offset=offsets[span[1] - 1] + 1,
+                    alignment="fuzzy",
+                )
+
+        return aligned
+
+    def _fuzzy_span(
+        self,
+        text: str,
+        pattern: str,
+        word_positions: Dict[str, List[int]]
+    ) -> Optional[Tuple[int, int]]:
+        """Find the span of text that best matches pattern, if close enough."""
+        # Every occurrence of a pattern word votes, weighted by its length, for
+        # where the pattern would start; votes are pooled in buckets of slack
+        slack = max(len(pattern) // 4, 1)
+        votes: Counter = Counter()
+        for match in _WORD.finditer(pattern):
+            positions = word_positions.get(match.group(), ())
+            if len(positions) > MAX_ANCHOR_OCCURRENCES:
+                continue
+            for position in positions:
+                votes[(position - match.start()) // slack] += len(match.group())
+
+        best: Optional[Tuple[float, int, int]] = None
+        for bucket, _ in votes.most_common(self.max_candidates):
+            # Compare the pattern against a window covering the bucket
+            window_start = max(0, bucket * slack - slack)
+            window_end = min(len(text), (bucket + 1) * slack + len(pattern) + slack)
+            blocks = [
+                block for block in SequenceMatcher(
+                    None, text[window_start:window_end], pattern, autojunk=False
+                ).get_matching_blocks()
+                if block.size
+            ]
+            if not blocks:
+                continue
+            start = window_start + blocks[0].a
+            end = window_start + blocks[-1].a + blocks[-1].size
+            # Count unmatched characters on both sides, like SequenceMatcher.ratio()
+            matched = sum(block.size for block in blocks)
+            score = 2 * matched / (len(pattern) + end - start)
+            if best is None or score > best[0]:
+                best = (score, start, end)
+
+        if best is None or best[0] < self.fuzzy_threshold:
+            return None
+        return best[1], best[2]
+
+
+def _word_positions(text: str) -> Dict[str, List[int]]:
+    """Map every word of text to the offsets where it occurs."""
+    positions: Dict[str, List[int]] = defaultdict(list)
+    for match in _WORD.finditer(text):
+        positions[match.group()].append(match.start())
+    return positions
@@ -1,6 +1,6 @@
 """LLM-powered quotation extraction service."""
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import ChatPromptTemplate
@@ -10,8 +10,9 @@ from ..models.schemas import Quotation
 class QuotationExtractor:
     """Service for extracting quotations using LLM."""
     
-    def __init__(self, model: str = "gpt-5", temperature: float = 0):
-        self.llm = ChatOpenAI(model=model, temperature=temperature)
+    def __init__(self, model: str = "gpt-5", temperature: float = 0, api_key: Optional[str] = None):
+        # Without an api_key, ChatOpenAI reads OPENAI_API_KEY from the environment
+        self.llm = ChatOpenAI(model=model, temperature=temperature, api_key=api_key)
         self.parser = JsonOutputParser(pydantic_object=Quotation)
         self.prompt = ChatPromptTemplate.from_template(
             "Extract all meaningful quotations, statements, or key passages from the following text. "
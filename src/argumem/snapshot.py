@@ -0,0 +1,280 @@
+"""Snapshot export/import as compressed JSONL and online backups."""
+
+import gzip
+import json
+import sqlite3
+import zlib
+from itertools import groupby
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .db import SCHEMA_VERSION, get_db, refresh_quotation_propositions
+
+SNAPSHOT_FORMAT = "argumem-snapshot"
+
+# Tables in dependency order, so parents are always imported before children.
+# quotation_proposition is derived and rebuilt after an import instead.
+SNAPSHOT_TABLES = (
+    "sources",
+    "quotations",
+    "propositions",
+    "arguments",
+    "argument_quotation",
+    "argument_proposition",
+)
+
+# Rows fetched from a cursor, or inserted with executemany, at a time.
+DEFAULT_BATCH_SIZE = 1000
+
+
+def iter_export(conn: sqlite3.Connection, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+    """
+    Serialize a database as JSONL lines, one row per line.
+
+    The first line is a header with the schema version; every other line is
+    ``{"table": ..., "row": {...}}``. Rows are streamed from the cursors in
+    batches, so memory use doesn't grow with the size of the database. All
+    tables are read within one transaction for a consistent snapshot.
+
+    Args:
+        conn: Connection to the database to export
+        batch_size: Number of rows fetched per round trip
+
+    Yields:
+        JSON lines terminated by a newline
+    """
+    yield json.dumps({"format": SNAPSHOT_FORMAT, "schema_version": SCHEMA_VERSION}) + "\n"
+    conn.execute("BEGIN")
+    try:
+        for table in SNAPSHOT_TABLES:
+            cursor = conn.execute(f"SELECT * FROM {table} ORDER BY rowid")
+            columns = [description[0] for description in cursor.description]
+            while rows := cursor.fetchmany(batch_size):
+                for row in rows:
+                    yield json.dumps({"table": table, "row": dict(zip(columns, row))}, ensure_ascii=False) + "\n"
+    finally:
+        conn.rollback()
+
+
+def iter_export_gzip(db_path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Stream a gzip-compressed JSONL snapshot of a database.
+
+    The generator may be resumed from different threads (as Starlette does
+    with sync iterators), though only one at a time, so its connection isn't
+    bound to the thread that created it.
+
+    Args:
+        db_path: Path to the SQLite database file
+        batch_size: Number of rows fetched per round trip
+
+    Yields:
+        Chunks of the compressed snapshot
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    compressor = zlib.compressobj(wbits=31)  # 31 selects the gzip container
+    try:
+        for line in iter_export(conn, batch_size):
+            chunk = compressor.compress(line.encode("utf-8"))
+            if chunk:
+                yield chunk
+        yield compressor.flush()
+    finally:
+        conn.close()
+
+
+def export_snapshot(db_path: str, out_path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Export a database to a gzip-compressed JSONL file.
+
+    Args:
+        db_path: Path to the SQLite database file
+        out_path: Path of the snapshot to write (conventionally ``.jsonl.gz``)
+        batch_size: Number of rows fetched per round trip
+
+    Returns:
+        The number of rows exported
+    """
+    conn = get_db(db_path)
+    count = -1  # Don't count the header line
+    try:
+        with gzip.open(out_path, "wt", encoding="utf-8") as f:
+            for line in iter_export(conn, batch_size):
+                f.write(line)
+                count += 1
+    finally:
+        conn.close()
+    return count
+
+
+def import_snapshot(snapshot_path: str, db_path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Import a gzip-compressed JSONL snapshot into an empty database.
+
+    Rows keep their IDs. Secondary indexes and triggers are dropped for the
+    duration of the import and recreated at the end, foreign keys are checked
+    once after all rows are in, and the materialized quotation-proposition
+    links are rebuilt. The whole import runs in one transaction.
+
+    Args:
+        snapshot_path: Path of the snapshot to read
+        db_path: Path to an initialized, empty SQLite database
+        batch_size: Number of rows inserted per executemany call
+
+    Returns:
+        The number of rows imported
+
+    Raises:
+        ValueError: If the snapshot is invalid, newer than the schema or has
+            unknown tables or columns, or the database already contains data
+    """
+    conn = get_db(db_path)
+    count = 0
+    try:
+        for table in SNAPSHOT_TABLES:
+            if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                raise ValueError(f"Database {db_path} is not empty (table {table} has rows)")
+
+        # Column names from the snapshot end up in SQL, so only accept real ones
+        allowed_columns = {
+            table: {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+            for table in SNAPSHOT_TABLES
+        }
+
+        # Foreign keys can only be toggled outside a transaction
+        conn.execute("PRAGMA foreign_keys=OFF;")
+        conn.execute("BEGIN")
+        deferred = _drop_indexes_and_triggers(conn)
+
+        with gzip.open(snapshot_path, "rt", encoding="utf-8") as f:
+            header = json.loads(next(f, "{}"))
+            if header.get("format") != SNAPSHOT_FORMAT:
+                raise ValueError(f"{snapshot_path} is not an ArguMem snapshot")
+            if header.get("schema_version", 0) > SCHEMA_VERSION:
+                raise ValueError(
+                    f"Snapshot schema version {header['schema_version']} is newer than {SCHEMA_VERSION}"
+                )
+
+            records = (json.loads(line) for line in f if line.strip())
+            # Consecutive rows of a table with the same columns share one statement
+            for (table, columns), group in groupby(records, key=_record_key):
+                if table not in SNAPSHOT_TABLES:
+                    raise ValueError(f"Unknown table in snapshot: {table}")
+                unknown = set(columns) - allowed_columns[table]
+                if unknown:
+                    raise ValueError(f"Unknown columns for table {table} in snapshot: {sorted(unknown)}")
+                count += _insert_batches(conn, table, columns, group, batch_size)
+
+        for sql in deferred:
+            conn.execute(sql)
+        refresh_quotation_propositions(conn)
+        violations = conn.execute("PRAGMA foreign_key_check").fetchall()
+        if violations:
+            raise ValueError(f"Snapshot has {len(violations)} rows with dangling references")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    return count
+
+
+def backup_db(
+    db_path: str,
+    dest_path: str,
+    pages: int = 256,
+    sleep: float = 0.01,
+    progress: Optional[Callable[[int, int, int], None]] = None
+) -> None:
+    """
+    Copy a live database with SQLite's online backup API.
+
+    The copy proceeds in steps of ``pages`` pages and releases the source
+    between steps, so writers are only ever blocked for a single step.
+    SQLite restarts a backup when another connection writes to the source;
+    each time that happens the step size is doubled so the backup still
+    finishes under a steady stream of writes.
+
+    Args:
+        db_path: Path to the SQLite database file
+        dest_path: Path of the backup file to write
+        pages: Number of pages copied per step
+        sleep: Seconds to pause between steps
+        progress: Optional callback receiving (status, remaining, total) pages
+    """
+    source = get_db(db_path)
+    dest = sqlite3.connect(dest_path)
+    try:
+        while True:
+            watcher = _RestartWatcher(progress)
+            try:
+                source.backup(dest, pages=pages, progress=watcher, sleep=sleep)
+                return
+            except _BackupRestarted:
+                pages *= 2
+    finally:
+        dest.close()
+        source.close()
+
+
+class _BackupRestarted(Exception):
+    """Raised from the progress callback to abort a restarted backup."""
+
+
+class _RestartWatcher:
+    """Backup progress callback that detects restarts of the backup."""
+
+    def __init__(self, progress: Optional[Callable[[int, int, int], None]]):
+        self.progress = progress
+        self.remaining: Optional[int] = None
+
+    def __call__(self, status: int, remaining: int, total: int) -> None:
+        if self.progress:
+            self.progress(status, remaining, total)
+        # Every step copies at least one page, so a count that doesn't go
+        # down means the backup started over
+        if self.remaining is not None and remaining >= self.remaining:
+            raise _BackupRestarted()
+        self.remaining = remaining
+
+
+def _record_key(record: Dict) -> Tuple[str, Tuple[str, ...]]:
+    return record["table"], tuple(record["row"])
+
+
+def _insert_batches(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: Tuple[str, ...],
+    records: Iterable[Dict],
+    batch_size: int
+) -> int:
+    """Insert records of one table in executemany batches."""
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+    count = 0
+    batch: List[Tuple] = []
+    for record in records:
+        batch.append(tuple(record["row"][column] for column in columns))
+        if len(batch) >= batch_size:
+            conn.executemany(sql, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+        count += len(batch)
+    return count
+
+
+def _drop_indexes_and_triggers(conn: sqlite3.Connection) -> List[str]:
+    """Drop secondary indexes and triggers, returning the SQL to recreate them."""
+    objects = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE type IN ('index', 'trigger') AND sql IS NOT NULL"
+    ).fetchall()
+    for object_type, name, _ in objects:
+        conn.execute(f"DROP {object_type.upper()} {name}")
+    return [sql for _, _, sql in objects]
@@ -0,0 +1,220 @@
+"""Tenant-aware routing of storage to per-tenant SQLite databases."""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from .db import ensure_db, get_db
+
+T = TypeVar("T")
+
+TENANT_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+
+class TenantRouter:
+    """
+    Map tenant names to their own database files.
+
+    Every tenant gets a separate SQLite file (and therefore its own writer
+    lock) under ``base_dir``. Databases are created and migrated the first
+    time a tenant is seen. Connections are checked out for the duration of a
+    block, so each is used by one thread at a time, and returned to an LRU
+    pool that drops the least recently used ones and those idle for too long.
+
+    Example:
+        >>> router = TenantRouter("tenants", default_db_path="argumem.db")
+        >>> path = router.db_path("acme")
+        >>> with router.connection("acme") as conn:
+        ...     conn.execute("SELECT COUNT(*) FROM sources").fetchone()
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        default_tenant: str = "default",
+        default_db_path: Optional[str] = None,
+        max_connections: int = 32,
+        idle_timeout: float = 300.0,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            base_dir: Directory holding one ``<tenant>.db`` file per tenant
+            default_tenant: Tenant used when none is given
+            default_db_path: Optional database file for the default tenant
+                (e.g. a pre-existing single-tenant database)
+            max_connections: Maximum number of idle connections kept open
+            idle_timeout: Seconds after which an idle connection is closed
+        """
+        self.base_dir = Path(base_dir)
+        self.default_tenant = default_tenant
+        self.default_db_path = default_db_path
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._ready: set = set()
+        # Serializes the first-time setup of each tenant without blocking others
+        self._setup_locks: Dict[str, threading.Lock] = {}
+        # Idle connections: id(connection) -> (tenant, connection, last used
+        # timestamp), least recently used first. Checked-out ones aren't here,
+        # so eviction never closes a connection that is in use.
+        self._idle: "OrderedDict[int, Tuple[str, sqlite3.Connection, float]]" = OrderedDict()
+
+    def resolve(self, tenant: Optional[str]) -> str:
+        """
+        Normalize and validate a tenant name.
+
+        Raises:
+            ValueError: If the name is not a safe file name
+        """
+        if not tenant:
+            return self.default_tenant
+        if not TENANT_PATTERN.match(tenant):
+            raise ValueError(f"Invalid tenant name: {tenant!r}")
+        return tenant
+
+    def db_path(self, tenant: Optional[str] = None) -> str:
+        """
+        Get the database file of a tenant, creating and migrating it if needed.
+
+        Args:
+            tenant: Tenant name (defaults to the default tenant)
+
+        Returns:
+            Path to the tenant's SQLite database
+        """
+        tenant = self.resolve(tenant)
+        path = self._path_for(tenant)
+        if tenant in self._ready:
+            return path
+
+        with self._lock:
+            setup_lock = self._setup_locks.setdefault(tenant, threading.Lock())
+        # Migrating is slow, so only requests for this tenant wait on it
+        with setup_lock:
+            if tenant not in self._ready:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                ensure_db(path)
+                self._ready.add(tenant)
+        return path
+
+    @contextmanager
+    def connection(self, tenant: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+        """
+        Check out a pooled connection to a tenant's database for a block.
+
+        The connection belongs to the caller until the block ends and must
+        not be closed; any transaction left open is rolled back when it
+        returns to the pool. Rows are returned as ``sqlite3.Row``.
+
+        Args:
+            tenant: Tenant name (defaults to the default tenant)
+
+        Yields:
+            An open connection to the tenant's database
+        """
+        tenant = self.resolve(tenant)
+        path = self.db_path(tenant)
+        conn = self._checkout(tenant)
+        if conn is None:
+            # Used by one thread at a time, but returned to the pool from any
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys=ON;")
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            self._checkin(tenant, conn)
+
+    def tenants(self) -> List[str]:
+        """List all tenants that have a database."""
+        names = set()
+        if self.base_dir.is_dir():
+            names.update(
+                p.stem for p in self.base_dir.glob("*.db") if TENANT_PATTERN.match(p.stem)
+            )
+        if self.default_db_path and Path(self.default_db_path).exists():
+            names.add(self.default_tenant)
+        return sorted(names)
+
+    def fan_out(self, func: Callable[[sqlite3.Connection], T], max_workers: int = 8) -> Dict[str, T]:
+        """
+        Run a read-only function against every tenant's database in parallel.
+
+        Each shard is queried over a short-lived connection so fan-out does
+        not push hot tenants out of the connection pool.
+
+        Args:
+            func: Function receiving a connection and returning a result
+            max_workers: Maximum number of shards queried concurrently
+
+        Returns:
+            Mapping of tenant name to the function's result
+        """
+        def run(tenant: str) -> T:
+            conn = get_db(self.db_path(tenant))
+            conn.row_factory = sqlite3.Row
+            try:
+                return func(conn)
+            finally:
+                conn.close()
+
+        tenants = self.tenants()
+        if not tenants:
+            return {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(tenants, executor.map(run, tenants)))
+
+    def evict_idle(self) -> None:
+        """Close connections that have been idle longer than ``idle_timeout``."""
+        with self._lock:
+            self._evict_idle_locked(time.monotonic())
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            while self._idle:
+                _, (_, conn, _) = self._idle.popitem(last=False)
+                conn.close()
+
+    def _path_for(self, tenant: str) -> str:
+        if tenant == self.default_tenant and self.default_db_path:
+            return self.default_db_path
+        return str(self.base_dir / f"{tenant}.db")
+
+    def _checkout(self, tenant: str) -> Optional[sqlite3.Connection]:
+        """Take the most recently used idle connection of a tenant, if any."""
+        with self._lock:
+            self._evict_idle_locked(time.monotonic())
+            for key in reversed(self._idle):
+                if self._idle[key][0] == tenant:
+                    return self._idle.pop(key)[1]
+        return None
+
+    def _checkin(self, tenant: str, conn: sqlite3.Connection) -> None:
+        """Return a connection to the pool, closing the least recently used extras."""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._idle[id(conn)] = (tenant, conn, time.monotonic())
+            while len(self._idle) > self.max_connections:
+                _, (_, oldest, _) = self._idle.popitem(last=False)
+                oldest.close()
+
+    def _evict_idle_locked(self, now: float) -> None:
+        # Entries are ordered by last use, so stop at the first fresh one
+        while self._idle:
+            key, (_, conn, last_used) = next(iter(self._idle.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            del self._idle[key]
+            conn.close()
@@ -0,0 +1,125 @@
+"""Tests for aligning quotations to offsets in their source."""
+
+import random
+import string
+import time
+
+from argumem.services.alignment import AhoCorasick, QuotationAligner, normalize_with_offsets
+
+
+def span(text, quotation):
+    return text[quotation["start_offset"]:quotation["end_offset"]]
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    matcher = AhoCorasick(["he", "she", "his", "hers"])
+
+    assert matcher.first_matches("ushers") == {0: 2, 1: 1, 3: 2}
+
+
+def test_aho_corasick_reports_first_occurrence_only():
+    matcher = AhoCorasick(["ab"])
+
+    assert matcher.first_matches("xxabab") == {0: 2}
+
+
+def test_normalize_maps_back_to_original_offsets():
+    text = "“Quoted”  \n text"
+
+    normalized, offsets = normalize_with_offsets(text)
+
+    assert normalized == '"quoted" text'
+    assert len(offsets) == len(normalized)
+    assert offsets[0] == 0
+    assert offsets[normalized.index("text")] == text.index("text")
+
+
+def test_normalize_casefold_expansion():
+    normalized, offsets = normalize_with_offsets("Straße")
+
+    assert normalized == "strasse"
+    assert offsets == [0, 1, 2, 3, 4, 4, 5]
+
+
+def test_exact_alignment():
+    text = "Intro. We will have self driving soon. Outro."
+    [quotation] = QuotationAligner().align(text, [{"text": "We will have self driving soon"}])
+
+    assert quotation["alignment"] == "exact"
+    assert span(text, quotation) == "We will have self driving soon"
+
+
+def test_duplicate_and_empty_quotations():
+    text = "alpha beta gamma"
+    aligned = QuotationAligner().align(text, [{"text": "beta"}, {"text": "beta"}, {"text": ""}])
+
+    assert [q["alignment"] for q in aligned] == ["exact", "exact", "unaligned"]
+    assert aligned[0]["start_offset"] == aligned[1]["start_offset"] == 6
+    assert aligned[2]["start_offset"] is None
+
+
+def test_normalized_alignment_with_quotes_and_whitespace():
+    text = "He said “we   will\nwin” loudly."
+    [quotation] = QuotationAligner().align(text, [{"text": '"We will win"'}])
+
+    assert quotation["alignment"] == "normalized"
+    assert span(text, quotation) == "“we   will\nwin”"
+
+
+def test_normalized_alignment_with_casefold_expansion():
+    text = "Die Straße ist lang."
+    [quotation] = QuotationAligner().align(text, [{"text": "STRASSE ist"}])
+
+    assert quotation["alignment"] == "normalized"
+    assert span(text, quotation) == "Straße ist"
+
+
+def test_fuzzy_alignment_above_threshold():
+    text = "Some intro. AI will likely be beneficial to humanity. Some outro."
+    [quotation] = QuotationAligner().align(text, [{"text": "AI will likly be benefical to humanity"}])
+
+    assert quotation["alignment"] == "fuzzy"
+    assert span(text, quotation) == "AI will likely be beneficial to humanity"
+
+
+def test_fuzzy_alignment_below_threshold_is_unaligned():
+    text = "Some intro. AI will likely be beneficial to humanity. Some outro."
+    [quotation] = QuotationAligner(fuzzy_threshold=0.85).align(
+        text, [{"text": "Robots may soon be harmful to cats"}]
+    )
+
+    assert quotation["alignment"] == "unaligned"
+    assert quotation["start_offset"] is None and quotation["end_offset"] is None
+
+
+def test_fuzzy_threshold_is_configurable():
+    text = "AI will likely be beneficial to humanity."
+    quotation = {"text": "AI will likly be benefical to humanity"}
+
+    assert QuotationAligner(fuzzy_threshold=0.9).align(text, [quotation])[0]["alignment"] == "fuzzy"
+    assert QuotationAligner(fuzzy_threshold=1.0).align(text, [quotation])[0]["alignment"] == "unaligned"
+
+
+def test_fuzzy_alignment_in_large_source_is_bounded():
+    rng = random.Random(0)
+    vocabulary = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(5000)]
+    filler = " ".join(rng.choice(vocabulary) for _ in range(300_000))
+    sentence = "Quantum annealers will outperform classical heuristics on logistics"
+    text = f"{filler[:len(filler) // 2]} {sentence}. {filler[len(filler) // 2:]}"
+
+    started = time.perf_counter()
+    [quotation] = QuotationAligner().align(
+        text, [{"text": "Quantum anealers will outperform clasical heuristics on logistics"}]
+    )
+
+    assert time.perf_counter() - started < 5
+    assert quotation["alignment"] == "fuzzy"
+    assert span(text, quotation) == sentence
+
+
+def test_fuzzy_alignment_picks_best_candidate_window():
+    text = "AI will be bad. Filler text in between. AI will likely be beneficial to humanity."
+    [quotation] = QuotationAligner().align(text, [{"text": "AI will likly be benefical to humanity"}])
+
+    assert quotation["alignment"] == "fuzzy"
+    assert span(text, quotation) == "AI will likely be beneficial to humanity"
@@ -0,0 +1,67 @@
+"""Tests for schema creation and migrations."""
+
+import pytest
+
+from argumem.db import SCHEMA_VERSION, ensure_db, get_db, migrate_db
+
+
+def test_ensure_db_upgrades_unversioned_database(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = get_db(path)
+    # The version 1 schema, before user_version was tracked
+    conn.executescript("""
+        CREATE TABLE sources (id INTEGER PRIMARY KEY, raw_text TEXT NOT NULL, context TEXT, title TEXT);
+        CREATE TABLE propositions (id INTEGER PRIMARY KEY, core_thesis TEXT NOT NULL);
+        CREATE TABLE quotations (id INTEGER PRIMARY KEY, source_id INTEGER NOT NULL,
+                                 quotation_text TEXT NOT NULL, locator TEXT);
+        CREATE TABLE arguments (id INTEGER PRIMARY KEY, proposition_id INTEGER NOT NULL, argument_text TEXT);
+        CREATE TABLE argument_quotation (argument_id INTEGER, quotation_id INTEGER,
+                                         PRIMARY KEY (argument_id, quotation_id));
+        CREATE TABLE argument_proposition (argument_id INTEGER, proposition_id INTEGER,
+                                           PRIMARY KEY (argument_id, proposition_id));
+    """)
+    conn.close()
+
+    ensure_db(path)
+    ensure_db(path)  # A second run finds nothing left to do
+
+    conn = get_db(path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(quotations)")}
+        assert {"start_offset", "end_offset", "alignment"} <= columns
+    finally:
+        conn.close()
+
+
+def test_ensure_db_refuses_newer_database(tmp_path):
+    path = str(tmp_path / "newer.db")
+    ensure_db(path)
+    conn = get_db(path)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 4}")
+    conn.close()
+
+    with pytest.raises(RuntimeError):
+        ensure_db(path)
+
+    conn = get_db(path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION + 4
+    finally:
+        conn.close()
+
+
+
+def test_ensure_db_on_current_database_skips_write_lock(tmp_path):
+    path = str(tmp_path / "busy.db")
+    ensure_db(path)
+    writer = get_db(path)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        conn = get_db(path)
+        conn.execute("PRAGMA busy_timeout = 0")
+        migrate_db(conn)  # Would fail with "database is locked" if it took the lock
+        conn.close()
+    finally:
+        writer.rollback()
+        writer.close()
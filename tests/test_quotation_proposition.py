@@ -0,0 +1,95 @@
+"""Tests for the trigger-maintained quotation_proposition links."""
+
+import pytest
+
+from argumem.db import ensure_db, get_db, rebuild_quotation_propositions
+
+
+def links(conn):
+    return conn.execute(
+        "SELECT quotation_id, proposition_id, polarity, argument_count "
+        "FROM quotation_proposition ORDER BY quotation_id, proposition_id, polarity"
+    ).fetchall()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "argumem.db")
+    ensure_db(path)
+    conn = get_db(path)
+    conn.execute("INSERT INTO sources (id, raw_text) VALUES (1, 'text')")
+    conn.executemany(
+        "INSERT INTO quotations (id, source_id, quotation_text) VALUES (?, 1, ?)",
+        [(1, "a"), (2, "b")]
+    )
+    conn.executemany("INSERT INTO propositions (id, core_thesis) VALUES (?, ?)", [(1, "P1"), (2, "P2")])
+    conn.executemany(
+        "INSERT INTO arguments (id, proposition_id, polarity) VALUES (?, ?, ?)",
+        [(1, 1, "support"), (2, 1, "counter"), (3, 1, "support")]
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def assert_matches_rebuild(conn, db_path):
+    maintained = links(conn)
+    rebuild_quotation_propositions(db_path)
+    assert links(conn) == maintained
+
+
+def test_triggers_track_argument_changes(db_path):
+    conn = get_db(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO argument_quotation (argument_id, quotation_id) VALUES (?, ?)",
+            [(1, 1), (1, 2), (2, 1), (3, 1)]
+        )
+        conn.commit()
+        # Arguments 1 and 3 share the (1, 1, support) link
+        assert links(conn) == [(1, 1, "counter", 1), (1, 1, "support", 2), (2, 1, "support", 1)]
+        assert_matches_rebuild(conn, db_path)
+
+        conn.execute("UPDATE arguments SET proposition_id = 2 WHERE id = 3")
+        conn.commit()
+        assert links(conn) == [
+            (1, 1, "counter", 1), (1, 1, "support", 1), (1, 2, "support", 1), (2, 1, "support", 1)
+        ]
+        assert_matches_rebuild(conn, db_path)
+
+        conn.execute("UPDATE arguments SET polarity = 'counter' WHERE id = 3")
+        conn.commit()
+        assert links(conn) == [
+            (1, 1, "counter", 1), (1, 1, "support", 1), (1, 2, "counter", 1), (2, 1, "support", 1)
+        ]
+        assert_matches_rebuild(conn, db_path)
+
+        # Cascades to argument_quotation after the argument row is gone
+        conn.execute("DELETE FROM arguments WHERE id = 1")
+        conn.commit()
+        assert links(conn) == [(1, 1, "counter", 1), (1, 2, "counter", 1)]
+        assert_matches_rebuild(conn, db_path)
+
+        conn.execute("DELETE FROM argument_quotation WHERE argument_id = 2")
+        conn.commit()
+        assert links(conn) == [(1, 2, "counter", 1)]
+        assert_matches_rebuild(conn, db_path)
+
+        conn.execute("DELETE FROM quotations WHERE id = 1")
+        conn.commit()
+        assert links(conn) == []
+        assert_matches_rebuild(conn, db_path)
+    finally:
+        conn.close()
+
+
+def test_duplicate_premise_is_counted_once(db_path):
+    conn = get_db(db_path)
+    try:
+        conn.execute("INSERT INTO argument_quotation (argument_id, quotation_id) VALUES (1, 1)")
+        conn.execute("INSERT OR IGNORE INTO argument_quotation (argument_id, quotation_id) VALUES (1, 1)")
+        conn.commit()
+        assert links(conn) == [(1, 1, "support", 1)]
+        assert_matches_rebuild(conn, db_path)
+    finally:
+        conn.close()
@@ -0,0 +1,129 @@
+"""Tests for the bulk write methods of the repositories."""
+
+import sqlite3
+
+import pytest
+
+from argumem.db import ensure_db, get_db, transaction
+from argumem.repositories import database
+from argumem.repositories.database import (
+    ArgumentRepository,
+    PropositionRepository,
+    QuotationRepository,
+    SourceRepository,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "argumem.db")
+    ensure_db(path)
+    return path
+
+
+def count(db_path, table):
+    conn = get_db(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_ids_follow_input_order_across_batches(db_path):
+    source_id = SourceRepository(db_path).create("text", "ctx")
+    quotations = [{"text": f"quotation {i}", "locator": str(i)} for i in range(1203)]
+
+    ids = QuotationRepository(db_path).create_many(quotations, source_id, batch_size=7)
+
+    assert len(ids) == 1203
+    conn = get_db(db_path)
+    try:
+        texts = dict(conn.execute("SELECT id, quotation_text FROM quotations").fetchall())
+    finally:
+        conn.close()
+    assert [texts[i] for i in ids] == [q["text"] for q in quotations]
+
+
+def test_empty_input_returns_no_ids(db_path):
+    assert SourceRepository(db_path).create_many([]) == []
+    assert QuotationRepository(db_path).create_many([], source_id=1) == []
+    assert PropositionRepository(db_path).create_many([]) == []
+    assert ArgumentRepository(db_path).create_many([]) == []
+    ArgumentRepository(db_path).link_quotations([])
+    ArgumentRepository(db_path).link_propositions([])
+
+
+def test_caller_transaction_is_rolled_back_together(db_path):
+    with pytest.raises(RuntimeError):
+        with transaction(db_path) as conn:
+            source_id = SourceRepository(db_path).create("text", "ctx", conn=conn)
+            QuotationRepository(db_path).create_many([{"text": "a"}, {"text": "b"}], source_id, conn=conn)
+            PropositionRepository(db_path).create_many(["P"], conn=conn)
+            raise RuntimeError("abort")
+
+    assert count(db_path, "sources") == 0
+    assert count(db_path, "quotations") == 0
+    assert count(db_path, "propositions") == 0
+
+
+def test_failing_batch_rolls_back_earlier_batches(db_path):
+    [proposition_id] = PropositionRepository(db_path).create_many(["P"])
+    arguments = [{"proposition_id": proposition_id}] * 10 + [{"proposition_id": proposition_id, "polarity": "maybe"}]
+
+    with pytest.raises(sqlite3.IntegrityError):
+        ArgumentRepository(db_path).create_many(arguments, batch_size=3)
+
+    assert count(db_path, "arguments") == 0
+
+
+def test_batch_size_is_capped_by_max_variables(db_path, monkeypatch):
+    # Six columns per quotation row, so at most two rows per statement
+    monkeypatch.setattr(database, "MAX_VARIABLES", 12)
+    source_id = SourceRepository(db_path).create("text", "ctx")
+    statements = []
+
+    with transaction(db_path) as conn:
+        conn.set_trace_callback(statements.append)
+        ids = QuotationRepository(db_path).create_many(
+            [{"text": str(i)} for i in range(5)], source_id, batch_size=500, conn=conn
+        )
+
+    assert len(ids) == 5
+    assert sum(s.startswith("INSERT INTO quotations") for s in statements) == 3
+
+
+def test_large_batch_size_stays_within_sqlite_limit(db_path):
+    source_id = SourceRepository(db_path).create("text", "ctx")
+
+    # 10000 rows of six columns would exceed SQLite's variable limit in one statement
+    ids = QuotationRepository(db_path).create_many(
+        [{"text": str(i)} for i in range(10000)], source_id, batch_size=10000
+    )
+
+    assert len(ids) == 10000
+
+
+def test_link_inserts_fire_quotation_proposition_triggers(db_path):
+    source_id = SourceRepository(db_path).create("text", "ctx")
+    q1, q2 = QuotationRepository(db_path).create_many([{"text": "a"}, {"text": "b"}], source_id)
+    p1, p2 = PropositionRepository(db_path).create_many(["P1", "P2"])
+    arguments = ArgumentRepository(db_path)
+    a1, a2, a3 = arguments.create_many([
+        {"proposition_id": p1},
+        {"proposition_id": p1},
+        {"proposition_id": p2, "polarity": "counter"},
+    ])
+
+    arguments.link_quotations([(a1, q1), (a2, q1), (a3, q2), (a1, q1)])
+    arguments.link_propositions([(a3, p1)])
+
+    conn = get_db(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT quotation_id, proposition_id, polarity, argument_count "
+            "FROM quotation_proposition ORDER BY quotation_id"
+        ).fetchall()
+    finally:
+        conn.close()
+    # The duplicate (a1, q1) link is ignored and doesn't inflate the count
+    assert rows == [(q1, p1, "support", 2), (q2, p2, "counter", 1)]
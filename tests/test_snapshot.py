@@ -0,0 +1,165 @@
+"""Tests for snapshot export/import and online backups."""
+
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from argumem.cli import main
+from argumem.db import SCHEMA_VERSION, ensure_db, get_db
+from argumem.snapshot import (
+    SNAPSHOT_FORMAT,
+    SNAPSHOT_TABLES,
+    backup_db,
+    export_snapshot,
+    import_snapshot,
+    iter_export_gzip,
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "source.db")
+    ensure_db(path)
+    conn = get_db(path)
+    conn.execute("INSERT INTO sources (id, raw_text, title) VALUES (1, 'Straße “quoted”', 'T')")
+    conn.execute("INSERT INTO quotations (id, source_id, quotation_text, start_offset, end_offset, alignment) "
+                 "VALUES (1, 1, 'Straße', 0, 6, 'exact')")
+    conn.execute("INSERT INTO propositions (id, core_thesis) VALUES (1, 'P')")
+    conn.execute("INSERT INTO arguments (id, proposition_id, polarity) VALUES (1, 1, 'counter')")
+    conn.execute("INSERT INTO argument_quotation (argument_id, quotation_id) VALUES (1, 1)")
+    conn.execute("INSERT INTO argument_proposition (argument_id, proposition_id) VALUES (1, 1)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def write_snapshot(path, records):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": SNAPSHOT_FORMAT, "schema_version": SCHEMA_VERSION}) + "\n")
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def test_export_import_round_trip(db_path, tmp_path):
+    snapshot = str(tmp_path / "snapshot.jsonl.gz")
+    target = str(tmp_path / "target.db")
+    ensure_db(target)
+
+    assert export_snapshot(db_path, snapshot) == 6
+    assert import_snapshot(snapshot, target) == 6
+
+    source, copy = get_db(db_path), get_db(target)
+    try:
+        for table in SNAPSHOT_TABLES + ("quotation_proposition",):
+            query = f"SELECT * FROM {table} ORDER BY 1, 2"
+            assert copy.execute(query).fetchall() == source.execute(query).fetchall(), table
+        assert copy.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'").fetchone()[0] == 4
+    finally:
+        source.close()
+        copy.close()
+
+
+def test_import_rejects_non_empty_database(db_path, tmp_path):
+    snapshot = str(tmp_path / "snapshot.jsonl.gz")
+    export_snapshot(db_path, snapshot)
+
+    with pytest.raises(ValueError, match="not empty"):
+        import_snapshot(snapshot, db_path)
+
+
+def test_import_rejects_unknown_columns(tmp_path):
+    snapshot = str(tmp_path / "evil.jsonl.gz")
+    target = str(tmp_path / "target.db")
+    ensure_db(target)
+    write_snapshot(snapshot, [
+        {"table": "sources", "row": {"id": 1, "raw_text) SELECT ? || sqlite_version() --": "x"}},
+    ])
+
+    with pytest.raises(ValueError, match="Unknown columns"):
+        import_snapshot(snapshot, target)
+
+    conn = get_db(target)
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'").fetchone()[0] == 4
+    finally:
+        conn.close()
+
+
+def test_import_rejects_dangling_references(tmp_path):
+    snapshot = str(tmp_path / "dangling.jsonl.gz")
+    target = str(tmp_path / "target.db")
+    ensure_db(target)
+    write_snapshot(snapshot, [
+        {"table": "quotations", "row": {"id": 1, "source_id": 42, "quotation_text": "q"}},
+    ])
+
+    with pytest.raises(ValueError, match="dangling"):
+        import_snapshot(snapshot, target)
+
+
+def test_gzip_export_can_be_resumed_from_other_threads(db_path):
+    chunks = iter_export_gzip(db_path, batch_size=1)
+    data = []
+    with ThreadPoolExecutor(max_workers=1) as first, ThreadPoolExecutor(max_workers=1) as second:
+        for i in range(1000):
+            executor = first if i % 2 else second
+            chunk = executor.submit(next, chunks, None).result()
+            if chunk is None:
+                break
+            data.append(chunk)
+
+    lines = gzip.decompress(b"".join(data)).decode("utf-8").splitlines()
+    assert json.loads(lines[0])["format"] == SNAPSHOT_FORMAT
+    assert len(lines) == 7
+
+
+def test_backup_copies_database(db_path, tmp_path):
+    dest = str(tmp_path / "backup.db")
+
+    backup_db(db_path, dest, pages=1, sleep=0)
+
+    conn = get_db(dest)
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert conn.execute("SELECT raw_text FROM sources").fetchone()[0] == "Straße “quoted”"
+    finally:
+        conn.close()
+
+
+def test_backup_finishes_under_concurrent_writes(db_path, tmp_path):
+    dest = str(tmp_path / "backup.db")
+    writer = get_db(db_path)
+    writer.executemany("INSERT INTO sources (raw_text) VALUES (?)", [("x" * 1000,)] * 200)
+    writer.commit()
+    calls = []
+
+    def write_between_steps(status, remaining, total):
+        # Rewriting a row keeps the size of the database, so a restarted
+        # backup reports the same number of remaining pages as before
+        calls.append(remaining)
+        assert len(calls) < 1000, "backup never finished"
+        writer.execute("UPDATE sources SET title = ? WHERE id = 1", (str(len(calls)),))
+        writer.commit()
+
+    try:
+        backup_db(db_path, dest, pages=1, sleep=0, progress=write_between_steps)
+    finally:
+        writer.close()
+
+    conn = get_db(dest)
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 201
+    finally:
+        conn.close()
+
+
+def test_cli_export_refuses_missing_database(tmp_path):
+    missing = tmp_path / "missing.db"
+
+    with pytest.raises(SystemExit):
+        main(["--db", str(missing), "export", str(tmp_path / "out.jsonl.gz")])
+    assert not missing.exists()
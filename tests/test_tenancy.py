@@ -0,0 +1,142 @@
+"""Tests for the tenant-aware storage router."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from argumem.db import SCHEMA_VERSION, get_db
+from argumem.tenancy import TenantRouter
+
+
+def test_db_path_creates_and_migrates_lazily(tmp_path):
+    router = TenantRouter(str(tmp_path / "tenants"))
+    assert router.tenants() == []
+
+    path = router.db_path("acme")
+
+    conn = get_db(path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 0
+    finally:
+        conn.close()
+    assert router.tenants() == ["acme"]
+
+
+def test_default_tenant_uses_default_db_path(tmp_path):
+    default_db = tmp_path / "argumem.db"
+    router = TenantRouter(str(tmp_path / "tenants"), default_db_path=str(default_db))
+
+    assert router.db_path(None) == str(default_db)
+    assert router.tenants() == ["default"]
+
+
+def test_connection_is_reused_after_checkin(tmp_path):
+    router = TenantRouter(str(tmp_path))
+
+    with router.connection("a") as first:
+        pass
+    with router.connection("a") as again, router.connection("b") as other:
+        assert again is first
+        assert other is not first
+    router.close()
+
+
+def test_concurrent_checkouts_get_separate_connections(tmp_path):
+    router = TenantRouter(str(tmp_path))
+
+    with router.connection("a") as first, router.connection("a") as second:
+        assert first is not second
+    assert len(router._idle) == 2
+    router.close()
+
+
+def test_checked_out_connections_are_never_evicted(tmp_path):
+    router = TenantRouter(str(tmp_path), max_connections=1, idle_timeout=0.05)
+
+    with router.connection("a") as busy:
+        time.sleep(0.1)
+        router.evict_idle()
+        with router.connection("b"), router.connection("c"):
+            pass
+        # Still usable while checked out
+        assert busy.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 0
+    router.close()
+
+
+def test_open_transaction_is_rolled_back_on_checkin(tmp_path):
+    router = TenantRouter(str(tmp_path))
+
+    with router.connection("a") as conn:
+        conn.execute("INSERT INTO sources (raw_text) VALUES ('uncommitted')")
+    with router.connection("a") as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0] == 0
+    router.close()
+
+
+def test_lru_eviction_at_max_connections(tmp_path):
+    router = TenantRouter(str(tmp_path), max_connections=2)
+    with router.connection("a") as first:
+        pass
+    with router.connection("b"):
+        pass
+    with router.connection("a"):  # "b" is now the least recently used
+        pass
+    with router.connection("c"):
+        pass
+
+    assert [tenant for tenant, _, _ in router._idle.values()] == ["a", "c"]
+    with router.connection("a") as conn:
+        assert conn is first
+    router.close()
+
+
+def test_idle_connections_are_evicted(tmp_path):
+    router = TenantRouter(str(tmp_path), idle_timeout=0.05)
+    with router.connection("a") as stale:
+        pass
+    time.sleep(0.1)
+
+    router.evict_idle()
+
+    assert not router._idle
+    with router.connection("a") as conn:
+        assert conn is not stale
+    router.close()
+
+
+@pytest.mark.parametrize("tenant", ["../evil", "a/b", "-leading-dash", "x" * 65, "semi;colon"])
+def test_rejects_unsafe_tenant_names(tmp_path, tenant):
+    router = TenantRouter(str(tmp_path))
+
+    with pytest.raises(ValueError):
+        router.db_path(tenant)
+    assert not list(tmp_path.iterdir())
+
+
+def test_fan_out_queries_every_tenant(tmp_path):
+    router = TenantRouter(str(tmp_path))
+    for i, tenant in enumerate(["t0", "t1", "t2", "t3"]):
+        with router.connection(tenant) as conn:
+            conn.executemany("INSERT INTO sources (raw_text) VALUES (?)", [("text",)] * i)
+            conn.commit()
+    router.close()
+
+    counts = router.fan_out(lambda conn: conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0])
+
+    assert counts == {"t0": 0, "t1": 1, "t2": 2, "t3": 3}
+
+
+def test_setup_of_one_tenant_does_not_block_others(tmp_path):
+    router = TenantRouter(str(tmp_path))
+    router.db_path("slow")
+    router._ready.discard("slow")
+
+    # Simulate a long first-time migration of "slow" on another thread
+    with router._setup_locks["slow"]:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            path = executor.submit(router.db_path, "fast").result(timeout=5)
+
+    assert path == str(tmp_path / "fast.db")
@@ -8,14 +8,18 @@ interface QuotationDetail {
   source_id: number;
   source_title: string | null;
   source_context: string;
-  source_text: string;
+  source_excerpt: string;
   source_timestamp: string;
+  start_offset: number | null;
+  end_offset: number | null;
+  alignment: 'exact' | 'normalized' | 'fuzzy' | 'unaligned' | null;
 }
 
 interface Proposition {
   id: number;
   proposition_text: string;
   paraphrase: string | null;
+  polarity: 'support' | 'counter';
 }
 
 interface QuotationDetailViewProps {
@@ -42,7 +46,7 @@ const QuotationDetailView: React.FC<QuotationDetailViewProps> = ({
         // Fetch quotation details and propositions in parallel
         const [quotationResponse, propositionsResponse] = await Promise.all([
           axios.get<QuotationDetail>(
-            `http://localhost:8000/quotations/${quotationId}`
+            `http://localhost:8000/quotations/${quotationId}?include_source_text=false`
           ),
           axios.get<Proposition[]>(
             `http://localhost:8000/quotations/${quotationId}/propositions`
@@ -191,7 +195,13 @@ const QuotationDetailView: React.FC<QuotationDetailViewProps> = ({
           </div>
 
           <div>
-            <strong>Content Preview:</strong>
+            <strong>
+              {quotation.start_offset !== null
+                ? 'In Source:'
+                : quotation.alignment === 'unaligned'
+                  ? 'Content Preview (quotation not found in source):'
+                  : 'Content Preview:'}
+            </strong>
             <p
               style={{
                 margin: '0.5rem 0',
@@ -199,7 +209,9 @@ const QuotationDetailView: React.FC<QuotationDetailViewProps> = ({
                 fontSize: '0.9rem',
               }}
             >
-              {truncateText(quotation.source_text)}
+              {quotation.start_offset !== null
+                ? quotation.source_excerpt
+                : truncateText(quotation.source_excerpt)}
             </p>
           </div>
         </div>
@@ -223,7 +235,7 @@ const QuotationDetailView: React.FC<QuotationDetailViewProps> = ({
           <div className="propositions-list">
             {propositions.map((proposition, index) => (
               <div
-                key={proposition.id}
+                key={`${proposition.id}-${proposition.polarity}`}
                 className="proposition-item"
                 style={{
                   border: '1px solid var(--border)',
@@ -237,7 +249,8 @@ const QuotationDetailView: React.FC<QuotationDetailViewProps> = ({
                   className="proposition-header"
                   style={{ marginBottom: '0.5rem' }}
                 >
-                  <strong>🎯 Proposition #{proposition.id}</strong>
+                  <strong>🎯 Proposition #{proposition.id}</strong>{' '}
+                  ({proposition.polarity === 'counter' ? 'countered' : 'supported'} by this quotation)
                 </div>
 
                 <div style={{ marginBottom: '1rem' }}>